@@ -11,18 +11,30 @@ OpenRouter 기반 AI 번역 모듈
 """
 
 import argparse
+import hashlib
 import json
+import logging
 import os
 import sys
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+try:
+    # requests>=2 uses urllib3 Retry
+    from urllib3.util.retry import Retry
+except Exception:  # pragma: no cover - very old environments
+    Retry = None  # type: ignore
 from dotenv import load_dotenv
 from fj_client.logger import get_logger
+from fj_client.utils import json_dumps_bytes, json_loads
 
 
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 DEFAULT_MODEL = "openai/gpt-oss-20b:free"
+FREE_FALLBACK_MODELS = ("tngtech/deepseek-r1t2-chimera:free", "qwen/qwen3-235b-a22b:free")
 
 
 class OpenRouterTranslator:
@@ -33,12 +45,45 @@ class OpenRouterTranslator:
         base_url: str = OPENROUTER_BASE_URL,
         http_referer: Optional[str] = None,
         x_title: Optional[str] = None,
+        cache_size: int = 1024,
     ) -> None:
         self.api_key = api_key
         self.model = model
         self.base_url = base_url.rstrip("/")
         self.http_referer = http_referer
         self.x_title = x_title
+        self.log = get_logger("translator")
+        # api_key/referer/title 은 불변이므로 헤더는 한 번만 구성
+        self._headers_cached = self._headers()
+        self._session = self._create_session()
+        # 재전송되는 동일 헤드라인은 API 호출 없이 반환 (LRU)
+        self.cache_size = max(0, cache_size)
+        self._cache: "OrderedDict[Tuple[str, str, str], Dict[str, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._body_templates: Dict[Tuple[str, Optional[int]], Dict[str, Any]] = {}
+
+    def _create_session(self) -> requests.Session:
+        # keep-alive 커넥션 풀로 뉴스마다 TLS 핸드셰이크를 반복하지 않도록 한다
+        s = requests.Session()
+        retry = None
+        if Retry is not None:
+            retry = Retry(
+                total=3,
+                # 읽기 타임아웃은 서버가 이미 처리 중일 수 있으므로 재전송하지 않음 (과금 중복 방지)
+                read=0,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("POST",),
+                raise_on_status=False,
+            )
+        # pool_block: 동시 요청이 pool_maxsize 를 넘으면 일회용 연결(추가 TLS 핸드셰이크)을
+        # 여는 대신 풀의 keep-alive 연결이 반환될 때까지 대기한다
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry or 0, pool_block=True)
+        s.mount("https://", adapter)
+        return s
+
+    def close(self) -> None:
+        self._session.close()
 
     def _headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {
@@ -52,101 +97,199 @@ class OpenRouterTranslator:
             headers["X-Title"] = self.x_title
         return headers
 
+    def _cache_key(self, text: str, target_lang: str) -> Tuple[str, str, str]:
+        normalized = " ".join(text.split())
+        return (self.model, target_lang, hashlib.sha1(normalized.encode("utf-8")).hexdigest())
+
+    def _cache_get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, str]]:
+        with self._cache_lock:
+            hit = self._cache.get(key)
+            if hit is None:
+                return None
+            self._cache.move_to_end(key)
+            return dict(hit)
+
+    def _cache_put(self, key: Tuple[str, str, str], result: Dict[str, str]) -> None:
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            self._cache[key] = dict(result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
     def translate(self, text: str, target_lang: str = "ko") -> Dict[str, str]:
         """
-        Structured Outputs 사용 번역.
+        Structured Outputs 사용 번역. 동일 원문(공백 정규화 기준)은 캐시에서 반환한다.
         반환: {"original": str, "translation": str, "explanation": str, "advice": str}
         """
-        # Structured Outputs 스키마
-        response_format: Dict[str, Any] = {
-            "type": "json_schema",
-            "json_schema": {
-                "name": "translation_result",
+        key = self._cache_key(text, target_lang)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        result = self._translate_uncached(text, target_lang)
+        self._cache_put(key, result)
+        return result
+
+    def translate_batch(self, texts: List[str], target_lang: str = "ko") -> List[Dict[str, str]]:
+        """
+        여러 뉴스를 한 번의 요청으로 번역. 결과는 입력 순서와 동일하게 정렬된다.
+        캐시에 있는 항목은 요청에서 제외된다.
+        반환: translate() 결과 dict 의 리스트 (len == len(texts))
+        """
+        keys = [self._cache_key(t, target_lang) for t in texts]
+        results: List[Optional[Dict[str, str]]] = [self._cache_get(k) for k in keys]
+        missing = [i for i, r in enumerate(results) if r is None]
+        if len(missing) == 1:
+            i = missing[0]
+            results[i] = self._translate_uncached(texts[i], target_lang)
+        elif missing:
+            fresh = self._translate_batch_uncached([texts[i] for i in missing], target_lang)
+            for i, r in zip(missing, fresh):
+                results[i] = r
+        for i in missing:
+            self._cache_put(keys[i], results[i])  # type: ignore[arg-type]
+        return results  # type: ignore[return-value]
+
+    def _translate_uncached(self, text: str, target_lang: str) -> Dict[str, str]:
+        user_prompt = f"Target={target_lang}\n{text}"
+        content = self._chat(self._get_body_template(target_lang), user_prompt)
+        try:
+            return _validate_result(json_loads(content))
+        except Exception as e:
+            raise RuntimeError(f"Unexpected structured output: {e}")
+
+    def _translate_batch_uncached(self, texts: List[str], target_lang: str) -> List[Dict[str, str]]:
+        # 본문의 줄바꿈/번호 목록과 항목 경계가 섞이지 않도록 입력을 JSON 배열로 전달
+        items = json_dumps_bytes([{"id": i, "text": t} for i, t in enumerate(texts)]).decode("utf-8")
+        user_prompt = (
+            f"Target={target_lang}\n"
+            f"Input is a JSON array; return one result per item in the same order (results[i] is id i):\n{items}"
+        )
+        content = self._chat(self._get_body_template(target_lang, len(texts)), user_prompt)
+        try:
+            results = json_loads(content)["results"]
+            if not isinstance(results, list) or len(results) != len(texts):
+                raise RuntimeError(f"expected {len(texts)} results")
+            return [_validate_result(r) for r in results]
+        except Exception as e:
+            raise RuntimeError(f"Unexpected structured output: {e}")
+
+    def _get_body_template(self, target_lang: str, n_items: Optional[int] = None) -> Dict[str, Any]:
+        """
+        요청 본문 중 원문을 제외한 고정 부분(model/extra_body/response_format/system)을
+        (target_lang, n_items) 별로 한 번만 구성하여 재사용한다. n_items=None 은 단건 번역.
+        """
+        key = (target_lang, n_items)
+        tmpl = self._body_templates.get(key)
+        if tmpl is not None:
+            return tmpl
+
+        schema = _result_schema(target_lang)
+        if n_items is None:
+            json_schema: Dict[str, Any] = {"name": "translation_result", "strict": True, "schema": schema}
+        else:
+            # Structured Outputs 는 최상위 object 만 허용하므로 배열을 results 필드로 감싼다
+            json_schema = {
+                "name": "translation_results",
                 "strict": True,
                 "schema": {
                     "type": "object",
                     "properties": {
-                        "original": {
-                            "type": "string",
-                            "description": "Original input text as-is",
-                        },
-                        "translation": {
-                            "type": "string",
-                            "description": f"Accurate, fluent translation of the original into {target_lang}",
-                        },
-                        "explanation": {
-                            "type": "string",
-                            "description": "Plain-language explanation of the news in the target language for non-experts (1-3 sentences)",
-                        },
-                        "advice": {
-                            "type": "string",
-                            "description": "Expert economic viewpoint on potential market/macro impact in the target language (1-2 sentences); empty string if no meaningful insight",
+                        "results": {
+                            "type": "array",
+                            "items": schema,
+                            "minItems": n_items,
+                            "maxItems": n_items,
                         },
                     },
-                    "required": ["original", "translation", "explanation", "advice"],
+                    "required": ["results"],
                     "additionalProperties": False,
                 },
-            },
-        }
+            }
 
-        system_hint = (
-            "You are a professional financial translator and analyst. Preserve proper nouns, "
-            "institution names, economic indicators, and numeric values exactly. Keep signs and "
-            "directions (e.g., up/down) accurate. Use concise, natural language suitable for a "
-            "real-time markets feed. All fields must be in the target language."
-        )
-        user_prompt = (
-            "Translate the following real-time economic news into the target language and respond "
-            "STRICTLY using the provided JSON schema fields. Requirements by field:\n"
-            "- translation: precise and fluent translation.\n"
-            "- explanation: plain-language summary for non-experts in the target language (1-3 sentences).\n"
-            "- advice: expert economic viewpoint on potential market or macro impact in the target language (1-2 sentences), "
-            "clearly stating uncertainty; if no meaningful insight, return an empty string.\n\n"
-            f"Target language: {target_lang}\n"
-            f"Original text:\n{text}"
-        )
-
-        body: Dict[str, Any] = {
+        tmpl = {
             "model": self.model,
-            "extra_body": {
-                "models": ["tngtech/deepseek-r1t2-chimera:free", "qwen/qwen3-235b-a22b:free"],
-            },
             "messages": [
-                {"role": "system", "content": [{"type": "text", "text": system_hint}]},
-                {"role": "user", "content": [{"type": "text", "text": user_prompt}]},
+                {"role": "system", "content": [{"type": "text", "text": _SYSTEM_HINT}]},
             ],
-            "response_format": response_format,
+            "response_format": {"type": "json_schema", "json_schema": json_schema},
         }
+        # 무료 모델은 혼잡 시 대체 모델로 라우팅 (유료 모델은 라우팅 오버헤드 없이 직접 호출)
+        if self.model.endswith(":free"):
+            tmpl["extra_body"] = {"models": list(FREE_FALLBACK_MODELS)}
+        self._body_templates[key] = tmpl
+        return tmpl
 
-        get_logger("translator").info("thinking...")
+    def _chat(self, template: Dict[str, Any], user_prompt: str) -> str:
+        # 템플릿은 공유되므로 얕은 복사 후 messages 만 교체
+        body = template.copy()
+        body["messages"] = [
+            template["messages"][0],
+            {"role": "user", "content": [{"type": "text", "text": user_prompt}]},
+        ]
+
+        self.log.info("thinking...")
         url = f"{self.base_url}/chat/completions"
-        resp = requests.post(url, headers=self._headers(), data=json.dumps(body), timeout=60)
+        resp = self._session.post(url, headers=self._headers_cached, data=json_dumps_bytes(body), timeout=60)
         if resp.status_code != 200:
             raise RuntimeError(
                 f"OpenRouter error: {resp.status_code} {resp.text[:500]}"
             )
-        data = resp.json()
-        get_logger("translator").debug(json.dumps(data, ensure_ascii=False))
+        data = json_loads(resp.content)
+        if self.log.isEnabledFor(logging.DEBUG):
+            self.log.debug("%s", json.dumps(data, ensure_ascii=False))
         try:
-            content = data["choices"][0]["message"]["content"]
-            parsed = json.loads(content)
-            # 기본 키 존재 확인
-            for k in ("original", "translation", "explanation"):
-                if k not in parsed or not isinstance(parsed[k], str):
-                    raise RuntimeError("Structured output missing required fields")
-            # optional advice -> ensure string
-            if "advice" not in parsed or not isinstance(parsed["advice"], str):
-                parsed["advice"] = ""
-            return parsed
+            return data["choices"][0]["message"]["content"]
         except Exception as e:
             raise RuntimeError(f"Unexpected structured output: {e}")
 
 
+_SYSTEM_HINT = "Professional financial translator; preserve numbers, signs, proper nouns."
+
+
+def _result_schema(target_lang: str) -> Dict[str, Any]:
+    """번역 결과 1건의 JSON 스키마."""
+    return {
+        "type": "object",
+        "properties": {
+            "original": {
+                "type": "string",
+                "description": "Original input text as-is",
+            },
+            "translation": {
+                "type": "string",
+                "description": f"Accurate, fluent translation of the original into {target_lang}",
+            },
+            "explanation": {
+                "type": "string",
+                "description": "Plain-language explanation of the news in the target language for non-experts (1-3 sentences)",
+            },
+            "advice": {
+                "type": "string",
+                "description": "Expert economic viewpoint on potential market/macro impact in the target language (1-2 sentences), stating uncertainty; empty string if no meaningful insight",
+            },
+        },
+        "required": ["original", "translation", "explanation", "advice"],
+        "additionalProperties": False,
+    }
+
+
+def _validate_result(parsed: Any) -> Dict[str, str]:
+    if not isinstance(parsed, dict):
+        raise RuntimeError("Structured output is not an object")
+    # 기본 키 존재 확인
+    for k in ("original", "translation", "explanation"):
+        if k not in parsed or not isinstance(parsed[k], str):
+            raise RuntimeError("Structured output missing required fields")
+    # optional advice -> ensure string
+    if "advice" not in parsed or not isinstance(parsed["advice"], str):
+        parsed["advice"] = ""
+    return parsed
+
+
 def _read_stdin() -> str:
-    chunks: List[str] = []
-    for line in sys.stdin:
-        chunks.append(line)
-    return "".join(chunks).strip()
+    return sys.stdin.read().strip()
 
 
 def main() -> None:
@@ -181,7 +324,10 @@ def main() -> None:
         http_referer=args.http_referer,
         x_title=args.x_title,
     )
-    result = translator.translate(text=text, target_lang=args.target)
+    try:
+        result = translator.translate(text=text, target_lang=args.target)
+    finally:
+        translator.close()
 
     if args.json:
         print(json.dumps(result, ensure_ascii=False))
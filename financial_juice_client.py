@@ -208,7 +208,14 @@ def main() -> None:
         client.start()
     except KeyboardInterrupt:
         log.info("Interrupted by user, stopping.")
+    finally:
+        # 정상 종료/에러 반환 시에도 대기 중인 번역/Slack 전송을 마저 처리
         client.stop()
+        if handler:
+            handler.close()
+        # 번역 워커가 끝난 뒤 OpenRouter keep-alive 세션 정리
+        if translator:
+            translator.close()
 
 
 if __name__ == "__main__":
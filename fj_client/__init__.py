@@ -18,7 +18,7 @@ from .constants import (
 from .client import SignalRClient
 from .handler import NewsHubTranslatorHandler, NewsHubFirestoreHandler
 from . import utils as utils
-from .slack import send_slack_message
+from .slack import send_slack_message, enqueue_slack_message
 
 __all__ = [
     "BASE_WS_HOST",
@@ -31,6 +31,7 @@ __all__ = [
     "NewsHubFirestoreHandler",
     "utils",
     "send_slack_message",
+    "enqueue_slack_message",
 ]
 
 
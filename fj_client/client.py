@@ -1,9 +1,11 @@
-import json
+import logging
+import queue
 import threading
 import time
 import urllib.parse
 from typing import Any, Dict, Optional
 import random
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 from requests import Session
@@ -20,43 +22,50 @@ from .constants import (
     BASE_WS_HOST,
     CONNECT_WS_TEMPLATE,
 )
-from .utils import extract_json_from_jsonp
-from .slack import send_slack_message
+from .utils import extract_json_from_jsonp_bytes, json_dumps_bytes, json_loads
+from .slack import enqueue_slack_message
+
+
+def _negotiate_query(ftoken: Optional[str], connection_data_raw: str, callback: str) -> str:
+    """negotiate 쿼리 중 호출마다 변하지 않는 부분 (타임스탬프 `_` 제외)."""
+    params = {
+        "clientProtocol": "2.1",
+        "connectionData": connection_data_raw,
+        "callback": callback,
+    }
+    if ftoken:
+        params["ftoken"] = ftoken
+    return urllib.parse.urlencode(params)
 
 
 def do_negotiate(
     ftoken: Optional[str],
     connection_data_encoded: str,
     callback: str,
-    headers: Dict[str, str],
+    headers: Optional[Dict[str, str]],
     cookies: Dict[str, str],
     *,
     session: Optional[Session] = None,
+    query: Optional[str] = None,
 ) -> Dict[str, Any]:
     ts = str(int(time.time() * 1000))
     base_url = BASE_WS_HOST + "/signalr/negotiate"
-    # connection_data_encoded는 WS용으로 인코딩됨. HTTP params는 raw로 주고 인코딩을 위임한다.
-    connection_data_raw = urllib.parse.unquote(connection_data_encoded)
-    params = {
-        "clientProtocol": "2.1",
-        "connectionData": connection_data_raw,
-        "callback": callback,
-        "_": ts,
-    }
-    if ftoken:
-        params["ftoken"] = ftoken
+    # 호출자가 고정 쿼리를 미리 만들어 넘기면 재사용 (SignalRClient 는 __init__ 에서 1회 생성)
+    if query is None:
+        # connection_data_encoded는 WS용으로 인코딩됨. HTTP 쿼리는 raw 값을 기준으로 인코딩한다.
+        query = _negotiate_query(ftoken, urllib.parse.unquote(connection_data_encoded), callback)
 
     sess = session or requests
     get_logger("client").debug("[negotiate] GET %s", base_url)
-    resp = sess.get(base_url, params=params, headers=headers, cookies=cookies, timeout=10)  # type: ignore[attr-defined]
+    resp = sess.get(f"{base_url}?{query}&_={ts}", headers=headers, cookies=cookies, timeout=10)  # type: ignore[attr-defined]
     if resp.status_code != 200:
         raise RuntimeError(
             f"negotiate failed: {resp.status_code} {resp.text[:300]}"
         )
-    body = extract_json_from_jsonp(resp.text)
+    body = extract_json_from_jsonp_bytes(resp.content)
     if not body:
         raise RuntimeError("negotiate: cannot extract JSON from response")
-    return json.loads(body)
+    return json_loads(body)
 
 
 class SignalRClient:
@@ -70,9 +79,34 @@ class SignalRClient:
         *,
         handler: Optional[Any] = None,
         slack_webhook_url: Optional[str] = None,
+        ping_interval: float = 60,
+        ping_timeout: float = 20,
+        handler_workers: int = 1,
+        inbox_size: int = 256,
+        max_frame_chars: int = 2 * 1024 * 1024,
     ) -> None:
         self.ftoken = ftoken
         self.connection_data_encoded = connection_data_encoded
+        # 재연결마다 반복되는 quote/unquote 를 피하기 위해 한 번만 계산
+        self._connection_data_raw = urllib.parse.unquote(connection_data_encoded)
+        self._ftoken_quoted = urllib.parse.quote(ftoken or "", safe="")
+        self._header_list = [f"{k}: {v}" for k, v in headers.items()]
+        # negotiate/start HTTP 쿼리의 고정 부분 (WS용과 달리 raw connectionData 기준으로 인코딩)
+        self._negotiate_query = _negotiate_query(ftoken, self._connection_data_raw, callback)
+        start_params = {
+            "transport": "webSockets",
+            "clientProtocol": "2.1",
+            "connectionData": self._connection_data_raw,
+            "callback": callback,
+        }
+        if ftoken:
+            start_params["ftoken"] = ftoken
+        self._start_query = urllib.parse.urlencode(start_params)
+        # 연결마다 바뀌는 connectionToken 만 남기고 WS URL 템플릿을 미리 채워둔다
+        self._ws_url_tmpl = (
+            CONNECT_WS_TEMPLATE.replace("{ftoken}", self._ftoken_quoted)
+            .replace("{connectionData}", connection_data_encoded)
+        )
         self.callback = callback
         self.headers = headers
         self.cookies = cookies
@@ -80,9 +114,8 @@ class SignalRClient:
         self.slack_webhook_url = slack_webhook_url
 
         self.ws: Optional[websocket.WebSocketApp] = None
-        self.connected = False
-        self._stop = False
-        self.lock = threading.Lock()
+        # stop() 요청 시 세워지며, 대기 중인 스레드를 즉시 깨운다
+        self._stop_evt = threading.Event()
         self.last_negotiate: Optional[Dict[str, Any]] = None
         self.connection_token: Optional[str] = None
         # retry 제어: on_error 발생 시 1회만 자동 재시도
@@ -90,41 +123,75 @@ class SignalRClient:
         # start 재진입 방지용 뮤텍스 (동시에 하나의 start만 실행)
         self._start_mutex = threading.Lock()
         self.log = get_logger("client")
-        self.session: Optional[Session] = self._create_session()
+        self.session: Session = self._create_session()
         # 연결 상태 동기화 및 재연결 설정
         self.connected_evt = threading.Event()
+        self._closed_evt = threading.Event()
         self.max_retries = 2
         self.backoff_base = 1.0  # seconds
         self.max_backoff = 30.0  # seconds
         self._retries = 0
         self._ws_thread: Optional[threading.Thread] = None
         self._reconnect_lock = threading.Lock()
+        self._reconnect_evt = threading.Event()
+        self._reconnect_delay = 0.0
+        # 연결이 이 시간(초) 이상 유지되어야 재시도 카운터를 초기화 (짧은 flapping 은 누적)
+        self.stable_reset_after = 30.0
+        self._stable_timer: Optional[threading.Timer] = None
+        self._reconnector = threading.Thread(target=self._reconnect_loop, name="fj-reconnect", daemon=True)
+        self._reconnector.start()
         self.open_wait_timeout = 5.0
+        # WS ping 주기/타임아웃. negotiate 의 KeepAliveTimeout 이 있으면 그에 맞춰 조정
+        self.ping_interval = ping_interval
+        self.ping_timeout = ping_timeout
+        self._ping_interval = ping_interval
+        # 비정상적으로 큰 프레임은 파싱 전에 버려 메모리 급증을 막는다 (str 길이 = 문자 수 기준, 바이트 아님)
+        self.max_frame_chars = max_frame_chars
+        # 핸들러 디스패치: 수신 스레드는 큐에 넣기만 하고, 워커 풀이 handler.handle 을 실행
+        self._inbox: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=inbox_size)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        if handler is not None:
+            # 기본 1: 프레임 수신 순서대로 handle() 을 호출한다.
+            # 2 이상은 순서 무관한 핸들러에서만 사용 (Slack 뉴스 순서가 뒤바뀔 수 있음)
+            workers = max(1, handler_workers)
+            self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fj-handler")
+            # 풀 내부 큐가 무한정 쌓이지 않도록 실행 중 작업 수를 워커 수로 제한
+            self._pool_slots = threading.BoundedSemaphore(workers)
+            self._dispatcher = threading.Thread(target=self._dispatch_loop, name="fj-dispatch", daemon=True)
+            self._dispatcher.start()
 
-    def _create_session(self) -> Optional[Session]:
-        try:
-            s = requests.Session()
-            if Retry is not None:
-                retry = Retry(
-                    total=3,
-                    backoff_factor=0.5,
-                    status_forcelist=(429, 500, 502, 503, 504),
-                    allowed_methods=("GET",),
-                    raise_on_status=False,
-                )
-                adapter = HTTPAdapter(max_retries=retry)
-                s.mount("https://", adapter)
-                s.mount("http://", adapter)
-            return s
-        except Exception:
-            return None
+    def _create_session(self) -> Session:
+        # negotiate/start 는 항상 이 세션을 통해 keep-alive 연결을 재사용한다
+        s = requests.Session()
+        # 공통 헤더는 세션에 한 번만 설정 (요청마다 headers= 병합 생략)
+        s.headers.update(self.headers)
+        retry = None
+        if Retry is not None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=("GET",),
+                raise_on_status=False,
+            )
+        # negotiate/start 는 같은 호스트이므로 작은 풀로 keep-alive 연결을 재사용
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry or 0)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        return s
+
+    @property
+    def connected(self) -> bool:
+        return self.connected_evt.is_set()
 
     def _notify_slack(self, text: str, icon_emoji: Optional[str] = None) -> None:
         if not self.slack_webhook_url:
             return
         try:
-            send_slack_message(
-                text=text,
+            # 연결/재연결 흐름이 Slack 응답을 기다리지 않도록 큐에 넣고 바로 반환
+            enqueue_slack_message(
+                text,
                 webhook_url=self.slack_webhook_url,
                 username="FJ Bot",
                 icon_emoji=icon_emoji,
@@ -134,17 +201,14 @@ class SignalRClient:
             pass
 
     def open_ws(self, connection_token: str) -> None:
-        ws_url = CONNECT_WS_TEMPLATE.format(
-            ftoken=urllib.parse.quote(self.ftoken or "", safe=""),
-            connectionToken=urllib.parse.quote(connection_token, safe=""),
-            connectionData=self.connection_data_encoded,
+        ws_url = self._ws_url_tmpl.replace(
+            "{connectionToken}", urllib.parse.quote(connection_token, safe="")
         )
-        header_list = [f"{k}: {v}" for k, v in self.headers.items()]
         self.log.info("[ws] connect to %s", ws_url)
         self.connected_evt.clear()
         self.ws = websocket.WebSocketApp(
             ws_url,
-            header=header_list,
+            header=self._header_list,
             on_open=self.on_open,
             on_message=self.on_message,
             # on_ping=self.on_ping,
@@ -152,8 +216,25 @@ class SignalRClient:
             on_close=self.on_close,
             on_error=self.on_error,
         )
+        ping_interval = self._ping_interval
+        ping_timeout: Optional[float] = None
+        if not ping_interval or ping_interval <= 0:
+            # 0 이하는 ping 비활성화 (ping_timeout 도 지정하면 run_forever 가 예외)
+            ping_interval = 0
+        elif self.ping_timeout and self.ping_timeout > 0:
+            # websocket-client 는 0 < ping_timeout < ping_interval 을 요구한다
+            ping_timeout = self.ping_timeout
+            if ping_timeout >= ping_interval:
+                ping_timeout = ping_interval - 1 if ping_interval > 1 else ping_interval / 2
         t = threading.Thread(
-            target=lambda: self.ws.run_forever(ping_interval=60, ping_timeout=50)
+            target=lambda: self.ws.run_forever(
+                ping_interval=ping_interval,
+                ping_timeout=ping_timeout,
+                # 신뢰 서버의 JSON 프레임이므로 프레임별 UTF-8 검증 생략
+                skip_utf8_validation=True,
+                # 재연결은 _schedule_reconnect 정책이 담당 (라이브러리 자동 재연결 비활성화)
+                reconnect=0,
+            )
         )
         t.daemon = True
         t.start()
@@ -161,27 +242,68 @@ class SignalRClient:
 
     def on_open(self, ws) -> None:  # type: ignore[no-untyped-def]
         self.log.info("[ws] opened")
+        self._closed_evt.clear()
         self.connected_evt.set()
-        with self.lock:
-            self.connected = True
-        # 정상 연결 시 재시도 카운터/플래그 초기화
+        # 정상 연결 시 재시도 플래그 초기화, 카운터는 연결이 안정적으로 유지된 뒤 초기화
         self.retry_attempted = False
-        self._retries = 0
+        self._cancel_stable_timer()
+        timer = threading.Timer(self.stable_reset_after, self._reset_retries)
+        timer.daemon = True
+        timer.start()
+        self._stable_timer = timer
         # Slack: 연결 성공
         self._notify_slack("[FinancialJuice] WebSocket 연결 성공", ":satellite:")
 
     def on_message(self, ws, message: str) -> None:  # type: ignore[no-untyped-def]
-        item = json.loads(message)
-        try:
-            preview = json.dumps(item, ensure_ascii=False)[:1000]
-        except Exception:
-            preview = str(item)[:1000]
-        self.log.debug("[ws message] %s", preview)
+        # SignalR keep-alive 프레임은 파싱 없이 무시
+        if message == "{}" or message == "{ }":
+            return
+        if len(message) > self.max_frame_chars:
+            self.log.warning("[ws message] drop %d-char frame (limit %d)", len(message), self.max_frame_chars)
+            return
+        item = json_loads(message)
+        if self.log.isEnabledFor(logging.DEBUG):
+            try:
+                preview = json_dumps_bytes(item)[:1000].decode("utf-8", "replace")
+            except Exception:
+                preview = str(item)[:1000]
+            self.log.debug("[ws message] %s", preview)
         if self.handler and isinstance(item, dict):
             try:
-                self.handler.handle(item)
-            except Exception as e:
-                self.log.exception("[handler error] %s", e)
+                self._inbox.put_nowait(item)
+            except queue.Full:
+                # 가장 오래된 프레임을 버리고 최신 프레임을 우선 (실시간 피드)
+                self.log.warning("[ws message] inbox full, dropping oldest frame")
+                try:
+                    dropped = self._inbox.get_nowait()
+                    if dropped is None:
+                        # stop() sentinel 은 유지
+                        self._inbox.put_nowait(None)
+                        return
+                    self._inbox.put_nowait(item)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _dispatch_loop(self) -> None:
+        assert self._pool is not None
+        while True:
+            item = self._inbox.get()
+            if item is None:
+                return
+            self._pool_slots.acquire()
+            try:
+                fut = self._pool.submit(self._handle_item, item)
+            except RuntimeError:
+                # stop() 이후 풀이 종료된 경우
+                self._pool_slots.release()
+                return
+            fut.add_done_callback(lambda _f: self._pool_slots.release())
+
+    def _handle_item(self, item: Dict[str, Any]) -> None:
+        try:
+            self.handler.handle(item)  # type: ignore[union-attr]
+        except Exception as e:
+            self.log.exception("[handler error] %s", e)
 
     def on_error(self, ws, error) -> None:  # type: ignore[no-untyped-def]
         self.log.error("[ws error] %s", error)
@@ -191,18 +313,24 @@ class SignalRClient:
     def on_close(self, ws, close_status_code, close_msg) -> None:  # type: ignore[no-untyped-def]
         self.log.info("[ws close] %s %s", close_status_code, close_msg)
         self.connected_evt.clear()
-        with self.lock:
-            self.connected = False
+        self._closed_evt.set()
+        self._cancel_stable_timer()
         # 정상/비정상 종료 모두 정책에 따라 재연결 시도
-        self._schedule_reconnect(reason=f"close {close_status_code} {close_msg}")
+        self._schedule_reconnect(reason=f"close {close_status_code} {close_msg}", code=close_status_code)
         # Slack: 연결 끊김
         self._notify_slack(
             f"[FinancialJuice] WebSocket 연결 종료 code={close_status_code} msg={close_msg}",
             ":warning:",
         )
 
-    def _schedule_reconnect(self, reason: str) -> None:
-        if self._stop:
+    def _schedule_reconnect(self, reason: str, code: Optional[int] = None) -> None:
+        """
+        지수 백오프 + full jitter 로 재연결을 예약한다.
+        지연은 [0, min(max_backoff, base * 2^retries)] 구간에서 균등 추출하여
+        서버 재시작 후 다수 클라이언트의 재연결 시점이 몰리지 않도록 분산한다.
+        """
+        # stop() 요청 후의 정상 종료(1000 포함)는 재연결 대상이 아님
+        if self._stop_evt.is_set():
             return
         # 중복 스케줄 방지
         if not self._reconnect_lock.acquire(blocking=False):
@@ -222,10 +350,11 @@ class SignalRClient:
                 pass
             return
 
-        # 지수 백오프 + 소폭 지터
-        base_delay = min(self.max_backoff, self.backoff_base * (2 ** self._retries))
-        jitter = random.uniform(0, 0.25 * base_delay)
-        delay = min(self.max_backoff, base_delay + jitter)
+        # 지수 백오프 + full jitter
+        # 1012(Service Restart)/1013(Try Again Later)는 서버 측 재시작/과부하 신호이므로 더 긴 지연에서 시작
+        backoff_base = max(self.backoff_base * 4, 5.0) if code in (1012, 1013) else self.backoff_base
+        cap = min(self.max_backoff, backoff_base * (2 ** self._retries))
+        delay = random.uniform(0, cap)
         self._retries += 1
         self.log.warning("[ws reconnect] in %.1fs (attempt %d/%d): %s", delay, self._retries, self.max_retries, reason)
         # Slack: 재연결 스케줄링
@@ -234,7 +363,16 @@ class SignalRClient:
             ":arrows_counterclockwise:",
         )
 
-        def _do() -> None:
+        self._reconnect_delay = delay
+        self._reconnect_evt.set()
+
+    def _reconnect_loop(self) -> None:
+        """단일 재연결 스레드: _schedule_reconnect 가 이벤트를 세울 때마다 한 번씩 재연결한다."""
+        while True:
+            self._reconnect_evt.wait()
+            self._reconnect_evt.clear()
+            if self._stop_evt.is_set():
+                return
             try:
                 # 이전 연결 정리
                 try:
@@ -242,8 +380,10 @@ class SignalRClient:
                         self.ws.close()
                 except Exception:
                     pass
-                time.sleep(delay)
-                if not self._stop:
+                # stop() 이 호출되면 백오프 대기를 즉시 중단
+                if self._stop_evt.wait(self._reconnect_delay):
+                    return
+                if not self._stop_evt.is_set():
                     before = time.time()
                     # start()를 백그라운드에서 실행하여 비블로킹 성공 판정
                     threading.Thread(target=self.start, daemon=True).start()
@@ -265,9 +405,13 @@ class SignalRClient:
                 except Exception:
                     pass
 
-        t = threading.Thread(target=_do)
-        t.daemon = True
-        t.start()
+    def _reset_retries(self) -> None:
+        self._retries = 0
+
+    def _cancel_stable_timer(self) -> None:
+        timer, self._stable_timer = self._stable_timer, None
+        if timer is not None:
+            timer.cancel()
 
     def start(self) -> None:
         # 동시에 하나의 start만 실행되도록 보장
@@ -276,19 +420,27 @@ class SignalRClient:
                 # 시작 시 재시도 가능 상태로 초기화
                 self.retry_attempted = False
                 self.connected_evt.clear()
+                self._closed_evt.clear()
                 n = do_negotiate(
                     ftoken=self.ftoken,
                     connection_data_encoded=self.connection_data_encoded,
                     callback=self.callback,
-                    headers=self.headers,
+                    headers=None,
                     cookies=self.cookies,
                     session=self.session,
+                    query=self._negotiate_query,
                 )
                 self.last_negotiate = n
                 conn_token = n.get("ConnectionToken") or n.get("ConnectionId")
                 if not conn_token:
                     raise RuntimeError("negotiate response missing ConnectionToken")
                 self.connection_token = conn_token
+                keep_alive = n.get("KeepAliveTimeout")
+                if keep_alive:
+                    # 서버 keep-alive 만료 전에 ping 을 보내 불필요한 끊김/재연결을 피한다
+                    self._ping_interval = max(15, int(float(keep_alive)) - 5)
+                else:
+                    self._ping_interval = self.ping_interval
 
                 self.open_ws(self.connection_token)
 
@@ -304,27 +456,14 @@ class SignalRClient:
                     return
 
                 ts = str(int(time.time() * 1000))
-                # HTTP start 호출은 params로 안전하게 구성 (WS용과 달리 raw connectionData 사용)
-                connection_data_raw = urllib.parse.unquote(self.connection_data_encoded)
+                # 고정 쿼리는 __init__ 에서 인코딩해 두고 connectionToken/_ 만 덧붙인다
                 start_base = BASE_WS_HOST + "/signalr/start"
-                start_params = {
-                    "transport": "webSockets",
-                    "clientProtocol": "2.1",
-                    "connectionToken": self.connection_token or "",
-                    "connectionData": connection_data_raw,
-                    "callback": self.callback,
-                    "_": ts,
-                }
-                if self.ftoken:
-                    start_params["ftoken"] = self.ftoken
-                self.log.debug("[start] GET %s", start_base)
-                r = (self.session or requests).get(  # type: ignore[attr-defined]
-                    start_base,
-                    params=start_params,
-                    headers=self.headers,
-                    cookies=self.cookies,
-                    timeout=10,
+                start_url = (
+                    f"{start_base}?{self._start_query}"
+                    f"&connectionToken={urllib.parse.quote(self.connection_token or '', safe='')}&_={ts}"
                 )
+                self.log.debug("[start] GET %s", start_base)
+                r = self.session.get(start_url, cookies=self.cookies, timeout=10)
                 self.log.info("[start] status %s %s", r.status_code, r.text)
 
 #                 self.handler.handle({
@@ -338,21 +477,23 @@ class SignalRClient:
 #                     ]
 #                 })  # type: ignore[attr-defined]
 
-                while True:
-                    if self._stop:
-                        return
-                    if not self.connected_evt.is_set():
-                        self.log.info("connection closed; exiting.")
-                        return
-                    time.sleep(0.5)
+                # on_close/stop 이 이벤트를 세울 때까지 폴링 없이 대기
+                self._closed_evt.wait()
+                if not self._stop_evt.is_set():
+                    self.log.info("connection closed; exiting.")
+                return
 
             except Exception as e:
                 self.log.exception("Error in start: %s", e)
                 return
 
     def stop(self) -> None:
-        self._stop = True
+        self._stop_evt.set()
         self.connected_evt.clear()
+        self._closed_evt.set()
+        self._cancel_stable_timer()
+        # 재연결 스레드 깨워서 종료
+        self._reconnect_evt.set()
         if self.ws:
             try:
                 self.ws.close()
@@ -366,9 +507,18 @@ class SignalRClient:
                 self._ws_thread.join(timeout=2.0)
         except Exception:
             pass
+        # 디스패처/핸들러 워커 종료 (sentinel 이후 대기 중 작업은 마저 처리)
+        if self._dispatcher is not None:
+            try:
+                self._inbox.put(None, timeout=1.0)
+            except queue.Full:
+                pass
+            self._dispatcher.join(timeout=2.0)
+        if self._pool is not None:
+            # 진행 중인 handle() 이 끝나야 이후 handler.close() 가 모든 항목을 처리할 수 있다
+            self._pool.shutdown(wait=True)
         # HTTP 세션 정리
         try:
-            if self.session:
-                self.session.close()
+            self.session.close()
         except Exception:
             pass
\ No newline at end of file
@@ -1,107 +1,339 @@
-from typing import Any, Dict, List, Optional
-import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import itertools
+import logging
+import queue
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from .slack import send_slack_message
 from .logger import get_logger
-import firebase_admin  # type: ignore
-from firebase_admin import firestore  # type: ignore
+from .utils import json_loads
 import hashlib, time
 
 
+# 허브 이름은 소문자로 정규화해 비교 (SignalR 허브 이름은 대소문자 구분 없음)
+_NEWSHUB = "newshub"
+_METHOD_OK = "sendUpdates"
+
+# Slack 메시지 하나에 담을 최대 글자 수 (초과 시 여러 메시지로 분할)
+_SLACK_MAX_CHARS = 4000
+_SLACK_SEPARATOR = "\n\n---\n\n"
+
+# Firestore WriteBatch 커밋당 최대 문서 수
+_FIRESTORE_BATCH_LIMIT = 500
+# 재연결 후 재전송된 뉴스 중복 적재 방지용 지문 보관 개수
+_FIRESTORE_SEEN_MAX = 4096
+
+# 번역할 가치가 있는 텍스트 판정용: 최소 길이와 ASCII 텍스트 내 영단어(4자 이상) 존재
+_MIN_TRANSLATE_LEN = 10
+_WORD_RE = re.compile(r"[A-Za-z]{4,}")
+
+
+def _get_either(d: Dict[str, Any], key: str, alt: str) -> Any:
+    """SignalR 2.x 는 대문자 키(H/M/A)를 보내므로 소문자 키는 누락(None)일 때만 조회."""
+    value = d.get(key)
+    if value is None:
+        value = d.get(alt)
+    return value
+
+
+def _hub_name(m: Dict[str, Any]) -> Optional[str]:
+    """메시지의 허브 이름을 소문자로 반환. 문자열이 아니면 None."""
+    hub = _get_either(m, "H", "h")
+    if not isinstance(hub, str):
+        return None
+    return hub.lower()
+
+
+def _is_translatable(text: str) -> bool:
+    """숫자/기호 위주의 짧은 메타데이터성 텍스트는 번역 API 호출 없이 건너뛴다."""
+    if len(text) < _MIN_TRANSLATE_LEN:
+        return False
+    if text.isascii() and not _WORD_RE.search(text):
+        return False
+    return True
+
+
+def _split_section(section: str) -> List[str]:
+    """_SLACK_MAX_CHARS 를 넘는 섹션을 가급적 줄바꿈 위치에서 잘라 여러 조각으로 나눈다."""
+    parts: List[str] = []
+    while len(section) > _SLACK_MAX_CHARS:
+        cut = section.rfind("\n", 0, _SLACK_MAX_CHARS)
+        if cut <= 0:
+            cut = _SLACK_MAX_CHARS
+        parts.append(section[:cut])
+        section = section[cut:].lstrip("\n")
+    if section:
+        parts.append(section)
+    return parts
+
+
+def _pack_sections(sections: List[str]) -> List[str]:
+    """섹션들을 구분선으로 이어 붙이되 메시지당 _SLACK_MAX_CHARS 를 넘지 않도록 묶는다."""
+    messages: List[str] = []
+    current: List[str] = []
+    size = 0
+    for section in (part for sec in sections for part in _split_section(sec)):
+        extra = len(section) + (len(_SLACK_SEPARATOR) if current else 0)
+        if current and size + extra > _SLACK_MAX_CHARS:
+            messages.append(_SLACK_SEPARATOR.join(current))
+            current, size = [], 0
+            extra = len(section)
+        current.append(section)
+        size += extra
+    if current:
+        messages.append(_SLACK_SEPARATOR.join(current))
+    return messages
+
+
 class NewsHubTranslatorHandler:
     """
     NewsHub/sendUpdates 프레임을 찾아 번역기를 통해 번역 결과를 출력하는 핸들러.
     translator는 ai_translator.OpenRouterTranslator 호환 객체로 가정한다.
+
+    수신 뉴스는 큐에 적재되고, 백그라운드 스레드가 batch_window 동안 최대 max_batch 건을
+    모아 translate_batch 한 번으로 번역한다. 결과는 수신 순서(seq)대로 출력/전송된다.
+    translate_batch 가 없거나 실패하면 항목별 translate 를 최대 translate_workers 개까지 동시에 호출한다.
+    handle()은 네트워크 호출을 하지 않으므로 웹소켓 수신 스레드에서 바로 호출해도 된다.
     """
 
-    def __init__(self, translator: Optional[Any], target_lang: str = "ko", slack_webhook_url: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        translator: Optional[Any],
+        target_lang: str = "ko",
+        slack_webhook_url: Optional[str] = None,
+        *,
+        max_batch: int = 8,
+        batch_window: float = 0.2,
+        queue_size: int = 256,
+        translate_workers: int = 4,
+    ) -> None:
         self.translator = translator
         self.target_lang = target_lang
         self.slack_webhook_url = slack_webhook_url
+        self.max_batch = max(1, max_batch)
+        self.batch_window = batch_window
         self.log = get_logger("handler.newshub")
+        self._seq = itertools.count()
+        # (hub, method) -> 처리 함수. 허브 이름은 소문자로 등록
+        self._routes: Dict[Tuple[str, str], Callable[[Dict[str, Any]], None]] = {
+            (_NEWSHUB, _METHOD_OK): self._on_send_updates,
+        }
+        # 유한 큐: 번역이 밀리면 put 이 대기하여 상위(SignalRClient inbox)로 backpressure 전달
+        # 항목: (seq, title, description, translate) — translate=False 면 번역 없이 제목만 알림
+        self._queue: "queue.Queue[Optional[Tuple[int, str, str, bool]]]" = queue.Queue(maxsize=max(1, queue_size))
+        # 항목별 번역(폴백 경로)용 풀: 워커 스레드만 제출하므로 풀 크기가 곧 동시 호출 상한
+        self._pool = ThreadPoolExecutor(max_workers=max(1, translate_workers), thread_name_prefix="newshub-item")
+        self._worker = threading.Thread(target=self._run, name="newshub-translate", daemon=True)
+        self._worker.start()
 
     def handle(self, frame_obj: Dict[str, Any]) -> None:
-        try:
-            msgs = frame_obj.get("M")
-            if not isinstance(msgs, list):
+        # 파싱 실패는 _on_send_updates 에서 개별 처리하고, 예기치 못한 예외는 호출자(SignalRClient)가 기록
+        # KeepAlive 등 M 이 없는 프레임은 즉시 반환
+        msgs = frame_obj.get("M")
+        if not msgs or not isinstance(msgs, list):
+            return
+        for m in msgs:
+            if not isinstance(m, dict):
+                continue
+            hub = _hub_name(m)
+            method = _get_either(m, "M", "m")
+            if hub is None or not isinstance(method, str):
+                continue
+            route = self._routes.get((hub, method))
+            if route is None:
+                continue
+            route(m)
+
+    def _on_send_updates(self, m: Dict[str, Any]) -> None:
+        args = _get_either(m, "A", "a")
+        if not isinstance(args, list) or not args:
+            return
+        payload = args[0]
+        news_list: List[Dict[str, Any]] = []
+        if isinstance(payload, str):
+            try:
+                news_list = json_loads(payload)
+            except Exception:
                 return
-            for m in msgs:
-                if not isinstance(m, dict):
-                    continue
-                hub = m.get("H") or m.get("h")
-                method = m.get("M") or m.get("m")
-                if str(hub).lower() != "newshub" or str(method) != "sendUpdates":
-                    continue
-                args = m.get("A") or m.get("a")
-                if not isinstance(args, list) or not args:
-                    continue
-                payload = args[0]
-                news_list: List[Dict[str, Any]] = []
-                if isinstance(payload, str):
-                    try:
-                        news_list = json.loads(payload)
-                    except Exception:
-                        continue
-                elif isinstance(payload, list):
-                    news_list = payload
+        elif isinstance(payload, list):
+            news_list = payload
+        else:
+            return
+        # "5" 나 객체 문자열처럼 목록이 아닌 페이로드는 무시
+        if not isinstance(news_list, list):
+            return
+
+        has_translator = bool(self.translator)
+        for news in news_list:
+            if not isinstance(news, dict):
+                continue
+            title = str(news.get("Title") or "").strip()
+            description = str(news.get("Description") or "").strip()
+            if not title and not description:
+                continue
+            # 번역 가치가 없는 항목도 알림은 보내고 번역 API 호출만 건너뛴다
+            translate = has_translator and _is_translatable(
+                title if not description else f"{title}\n\n{description}"
+            )
+            # 네트워크 I/O(Slack/번역)는 워커 스레드에서 처리하여 웹소켓 수신 스레드를 막지 않는다
+            self._queue.put((next(self._seq), title, description, translate))
+
+    def close(self) -> None:
+        """
+        번역 워커 종료. 대기 중인 항목을 모두 번역/전송할 때까지 기다린다
+        (번역 지연에 따라 오래 걸릴 수 있으며, 중단하려면 한 번 더 인터럽트).
+        """
+        if self._worker.is_alive():
+            self.log.info("[translate] flushing %d queued items before exit", self._queue.qsize())
+            self._queue.put(None)
+            self._worker.join()
+        self._pool.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            batch.sort(key=lambda it: it[0])
+            try:
+                self._translate_batch(batch)
+            except Exception as e:
+                self.log.exception("[translate handler error] %s", e)
+            if stop:
+                return
+
+    def _translate_batch(self, batch: List[Tuple[int, str, str, bool]]) -> None:
+        # Slack 알림은 배치당 한 번만 전송 (항목별 섹션을 구분선으로 연결)
+        sections: List[str] = []
+        if not self.translator:
+            self.log.info("[translate skipped] translator not configured")
+            if self.slack_webhook_url:
+                sections = [f"새 뉴스: {title}" for _, title, _, _ in batch]
+            self._send_slack(sections)
+            return
+        # 번역 대상 항목만 API 로 보내고, 결과는 batch 내 위치로 되돌려 매핑
+        positions = [i for i, item in enumerate(batch) if item[3]]
+        texts = [
+            title if not description else f"{title}\n\n{description}"
+            for _, title, description, _ in (batch[i] for i in positions)
+        ]
+        results: Optional[List[Dict[str, str]]] = None
+        # INFO 비활성 시 결과 로그 문자열(본문 미리보기 등)을 아예 만들지 않는다
+        info_on = self.log.isEnabledFor(logging.INFO)
+        if len(texts) > 1 and hasattr(self.translator, "translate_batch"):
+            try:
+                results = self.translator.translate_batch(texts, target_lang=self.target_lang)
+            except Exception as e:
+                self.log.warning("[translate batch error] %s; falling back to per-item", e)
+        futures: Optional[List[Future]] = None
+        if results is None and len(texts) > 1:
+            # 항목별 번역은 LLM 지연에 묶인 I/O 이므로 동시에 요청하고 결과는 순서대로 수집
+            futures = [
+                self._pool.submit(self.translator.translate, text=text, target_lang=self.target_lang)
+                for text in texts
+            ]
+        slot = {pos: k for k, pos in enumerate(positions)}
+        for i, (_, title, description, translate) in enumerate(batch):
+            if not translate:
+                self.log.info("[translate skipped] not translatable: %s", title or description)
+                section = f"새 뉴스: {title}" if title else ""
+                if section:
+                    sections.append(section)
+                continue
+            k = slot[i]
+            try:
+                if results is not None:
+                    result = results[k]
+                elif futures is not None:
+                    result = futures[k].result()
                 else:
-                    continue
+                    result = self.translator.translate(text=texts[k], target_lang=self.target_lang)
+                if info_on:
+                    self._log_result(title, description, result)
+                section = self._slack_section(title, result)
+            except Exception as e:
+                self.log.exception("[translate error] %s", e)
+                # 번역 실패 시에도 뉴스 자체는 알림에 포함
+                section = f"새 뉴스: {title}" if title else ""
+            if section:
+                sections.append(section)
+        self._send_slack(sections)
 
-                for news in news_list:
-                    if not isinstance(news, dict):
-                        continue
-                    title = str(news.get("Title") or "").strip()
-                    description = str(news.get("Description") or "").strip()
-                    if not title and not description:
-                        continue
-                    # 비즈니스 알림은 명시적으로 Slack 전송 유지
-                    if self.slack_webhook_url:
-                        send_slack_message(f"새 뉴스: {title}", webhook_url=self.slack_webhook_url)
-                    text = title if not description else f"{title}\n\n{description}"
-                    if not self.translator:
-                        self.log.info("[translate skipped] translator not configured")
-                        continue
-                    try:
-                        result = self.translator.translate(text=text, target_lang=self.target_lang)
-                        self.log.info("=== 번역 결과 ===")
-                        if title:
-                            self.log.info("원문 제목: %s", title)
-                        if description:
-                            preview = description[:500]
-                            self.log.info("원문 본문: %s", preview + ("..." if len(description) > 500 else ""))
-                        self.log.info("번역문: %s", result.get("translation", ""))
-                        self.log.info("설명: %s", result.get("explanation", ""))
-                        advice = result.get("advice", "")
-                        if advice:
-                            self.log.info("조언: %s", advice)
-                        self.log.info("=================")
-
-                        # Slack 알림 전송
-                        slack_lines: List[str] = []
-                        if title:
-                            slack_lines.append(f"*{title}*")
-                        translation_text = str(result.get("translation", "")).strip()
-                        if translation_text:
-                            slack_lines.append(translation_text)
-                        if advice:
-                            slack_lines.append(f"(조언) {advice}")
-                        if slack_lines:
-                            slack_text = "\n\n".join(slack_lines)
-                            send_res = send_slack_message(slack_text, webhook_url=self.slack_webhook_url)
-                            if not send_res.get("ok"):
-                                self.log.error("[slack error] %s", send_res.get("error"))
-                    except Exception as e:
-                        self.log.exception("[translate error] %s", e)
-        except Exception as e:
-            self.log.exception("[translate handler error] %s", e)
+    def _log_result(self, title: str, description: str, result: Dict[str, str]) -> None:
+        # 항목당 한 번의 로그 레코드(멀티라인)로 출력하여 핸들러 락/쓰기 횟수를 줄인다
+        lines = ["=== 번역 결과 ==="]
+        if title:
+            lines.append(f"원문 제목: {title}")
+        if description:
+            desc_len = len(description)
+            preview = description[:500] if desc_len > 500 else description
+            lines.append("원문 본문: " + preview + ("..." if desc_len > 500 else ""))
+        lines.append(f"번역문: {result.get('translation', '')}")
+        lines.append(f"설명: {result.get('explanation', '')}")
+        advice = result.get("advice", "")
+        if advice:
+            lines.append(f"조언: {advice}")
+        lines.append("=================")
+        self.log.info("%s", "\n".join(lines))
 
+    @staticmethod
+    def _slack_section(title: str, result: Dict[str, str]) -> str:
+        slack_lines: List[str] = []
+        if title:
+            slack_lines.append(f"*{title}*")
+        translation_text = str(result.get("translation", "")).strip()
+        if translation_text:
+            slack_lines.append(translation_text)
+        advice = result.get("advice", "")
+        if advice:
+            slack_lines.append(f"(조언) {advice}")
+        return "\n\n".join(slack_lines)
+
+    def _send_slack(self, sections: List[str]) -> None:
+        if not sections:
+            return
+        for text in _pack_sections(sections):
+            send_res = send_slack_message(
+                text,
+                webhook_url=self.slack_webhook_url,
+            )
+            if not send_res.get("ok"):
+                self.log.error("[slack error] %s", send_res.get("error"))
 
 
 class NewsHubFirestoreHandler:
     """
     NewsHub/sendUpdates 프레임에서 뉴스 항목을 추출하여 Firestore 컬렉션에 적재.
+
+    handle()은 문서를 만들어 큐에 넣기만 하고, 커밋(RPC)은 백그라운드 writer 스레드가 수행한다.
     """
 
-    def __init__(self, *, collection: str = "news", credentials_path: str = "secret/firebase-credentials.json") -> None:
+    def __init__(
+        self,
+        *,
+        collection: str = "news",
+        credentials_path: str = "secret/firebase-credentials.json",
+        queue_size: int = 256,
+    ) -> None:
+        # firebase_admin 은 import 비용이 크므로 Firestore 핸들러를 실제로 만들 때만 로드
+        import firebase_admin  # type: ignore
+        from firebase_admin import firestore  # type: ignore
+
         # firebase_admin 초기화 (이미 초기화된 경우 건너뜀)
         if not firebase_admin._apps:  # type: ignore[attr-defined]
             from firebase_admin import credentials  # type: ignore
@@ -109,54 +341,127 @@ class NewsHubFirestoreHandler:
             firebase_admin.initialize_app(cred)
         self.db = firestore.client()
         self.collection = collection
+        self._col = self.db.collection(collection)
+        # 서버 타임스탬프 sentinel 은 항목마다 모듈 속성을 조회하지 않도록 캐시
+        self._SST = firestore.SERVER_TIMESTAMP
         self.log = get_logger("handler.firestore")
+        # 최근 적재한 뉴스 지문 (LRU, 여러 디스패치 스레드에서 접근하므로 락으로 보호)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._seen_lock = threading.Lock()
+        # 유한 큐: 커밋이 밀리면 put 이 대기하여 상위(SignalRClient inbox)로 backpressure 전달
+        self._writes: "queue.Queue[Optional[List[Tuple[str, Dict[str, Any], str]]]]" = queue.Queue(
+            maxsize=max(1, queue_size)
+        )
+        self._writer = threading.Thread(target=self._write_loop, name="firestore-writer", daemon=True)
+        self._writer.start()
+
+    def close(self) -> None:
+        """writer 종료. 대기 중인 커밋을 모두 처리할 때까지 기다린다."""
+        if self._writer.is_alive():
+            self.log.info("[firestore] flushing %d queued batches before exit", self._writes.qsize())
+            self._writes.put(None)
+            self._writer.join()
+
+    def _write_loop(self) -> None:
+        while True:
+            pending = self._writes.get()
+            if pending is None:
+                return
+            self._commit(pending)
+
+    @staticmethod
+    def _fingerprint(raw_id: Any, news: Dict[str, Any]) -> str:
+        title = str(news.get("Title") or "").strip().lower()
+        key = f"{raw_id}|{title}|{news.get('DatePublished') or ''}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+
+    def _mark_seen(self, key: str) -> bool:
+        """처음 보는 지문이면 등록 후 True, 이미 본 지문이면 False."""
+        with self._seen_lock:
+            if key in self._seen:
+                self._seen.move_to_end(key)
+                return False
+            self._seen[key] = None
+            if len(self._seen) > _FIRESTORE_SEEN_MAX:
+                self._seen.popitem(last=False)
+            return True
+
+    def _forget(self, keys: List[str]) -> None:
+        # 커밋 실패한 문서는 재전송 시 다시 적재될 수 있도록 지문을 되돌린다
+        with self._seen_lock:
+            for key in keys:
+                self._seen.pop(key, None)
 
     def handle(self, frame_obj: Dict[str, Any]) -> None:
+        # 프레임 내 문서를 모아 writer 스레드에서 WriteBatch 로 한 번에 커밋 (문서별 RPC 왕복 제거)
+        pending: List[Tuple[str, Dict[str, Any], str]] = []
+        time_ns = time.time_ns
         try:
+            # KeepAlive 등 M 이 없는 프레임은 즉시 반환
             msgs = frame_obj.get("M")
-            if not isinstance(msgs, list):
+            if not msgs or not isinstance(msgs, list):
                 return
             for m in msgs:
-                if not isinstance(m, dict):
+                if type(m) is not dict:
                     continue
-                hub = m.get("H") or m.get("h")
-                method = m.get("M") or m.get("m")
-                if str(hub).lower() != "newshub" or str(method) != "sendUpdates":
+                # 대부분의 비대상 메시지는 메서드 비교 한 번으로 걸러지도록 메서드를 먼저 확인
+                if _get_either(m, "M", "m") != _METHOD_OK:
                     continue
-                args = m.get("A") or m.get("a")
+                if _hub_name(m) != _NEWSHUB:
+                    continue
+                args = _get_either(m, "A", "a")
                 if not isinstance(args, list) or not args:
                     continue
                 payload = args[0]
                 news_list: List[Dict[str, Any]] = []
                 if isinstance(payload, str):
                     try:
-                        news_list = json.loads(payload)
+                        news_list = json_loads(payload)
                     except Exception:
                         continue
                 elif isinstance(payload, list):
                     news_list = payload
                 else:
                     continue
+                if not isinstance(news_list, list):
+                    continue
 
                 for news in news_list:
                     if not isinstance(news, dict):
                         continue
+                    # NewsID 는 지문/로그/문서 ID 에 모두 쓰이므로 한 번만 조회
+                    raw_id = news.get("NewsID")
+                    key = self._fingerprint(raw_id, news)
+                    if not self._mark_seen(key):
+                        self.log.debug("[firestore skipped] duplicate news: %s", raw_id)
+                        continue
                     # 외부 스키마는 그대로 보존하며 타임스탬프 필드만 추가/갱신
-                    doc = dict(news)
+                    doc = {**news, "updatedAt": self._SST}
                     if "createdAt" not in doc:
-                        doc["createdAt"] = firestore.SERVER_TIMESTAMP
-                    doc["updatedAt"] = firestore.SERVER_TIMESTAMP
-                    try:
-                        ts_ms = int(time.time()*1000)
-                        news_id = str(news.get("NewsID") or "").strip()
-                        # published_at = str(news.get("DatePublished") or "").strip()
-                        # title = str(news.get("Title") or "").strip()
-                        # content_key = f"{news_id}-{published_at}-{title}".encode("utf-8")
-                        # suffix = hashlib.sha1(content_key).hexdigest()[:12]
-                        doc_id = f"{ts_ms}-{news_id}"
-                        self.db.collection(self.collection).document(doc_id).set(doc)
-                    except Exception as e:
-                        self.log.exception("[firestore write error] %s", e)
-        except Exception as e:
-            self.log.exception("[firestore handler error] %s", e)
+                        doc["createdAt"] = self._SST
+                    ts_ms = time_ns() // 1_000_000
+                    news_id = str(raw_id or "").strip()
+                    # published_at = str(news.get("DatePublished") or "").strip()
+                    # title = str(news.get("Title") or "").strip()
+                    # content_key = f"{news_id}-{published_at}-{title}".encode("utf-8")
+                    # suffix = hashlib.sha1(content_key).hexdigest()[:12]
+                    doc_id = f"{ts_ms}-{news_id}"
+                    pending.append((doc_id, doc, key))
+        finally:
+            # 중간에 예외가 나더라도 이미 모은 문서는 커밋 (중복 지문이 등록된 상태이므로)
+            if pending:
+                self._writes.put(pending)
+
+    def _commit(self, pending: List[Tuple[str, Dict[str, Any], str]]) -> None:
+        # WriteBatch 는 커밋당 최대 500건
+        for start in range(0, len(pending), _FIRESTORE_BATCH_LIMIT):
+            chunk = pending[start : start + _FIRESTORE_BATCH_LIMIT]
+            try:
+                batch = self.db.batch()
+                for doc_id, doc, _ in chunk:
+                    batch.set(self._col.document(doc_id), doc)
+                batch.commit()
+            except Exception as e:
+                self.log.exception("[firestore write error] %d docs: %s", len(chunk), e)
+                self._forget([key for _, _, key in chunk])
 
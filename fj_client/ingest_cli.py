@@ -10,7 +10,6 @@ from . import (
     DEFAULT_CONNECTION_DATA_JSON as FJ_DEFAULT_CONNECTION_DATA_JSON,
     DEFAULT_CALLBACK as FJ_DEFAULT_CALLBACK,
     SignalRClient as FJSignalRClient,
-    NewsHubFirestoreHandler as FJFirestoreHandler,
 )
 from .utils import build_headers, load_cookies
 
@@ -64,6 +63,9 @@ def main() -> None:
     )
     log = get_logger("cli.ingest")
 
+    # 인자 검증이 끝난 뒤에 Firestore 핸들러(firebase_admin)를 로드
+    from .handler import NewsHubFirestoreHandler as FJFirestoreHandler
+
     collection = "news-dev" if args.dev else "news"
     handler = FJFirestoreHandler(collection=collection, credentials_path=args.firebase_credentials)
     client = FJSignalRClient(
@@ -80,7 +82,10 @@ def main() -> None:
         client.start()
     except KeyboardInterrupt:
         log.info("Interrupted by user, stopping.")
+    finally:
+        # 정상 종료/에러 반환 시에도 대기 중인 Firestore 커밋을 마저 처리
         client.stop()
+        handler.close()
 
 
 if __name__ == "__main__":
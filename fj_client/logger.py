@@ -1,13 +1,13 @@
-import json
 import logging
 import logging.handlers
 import sys
+import threading
 import time
-from collections import deque
 from datetime import datetime, timezone
-from typing import Deque, Optional, Union
+from typing import Optional, Union
 
-from .slack import send_slack_message
+from .slack import enqueue_slack_message
+from .utils import json_dumps_bytes
 import os
 
 
@@ -23,10 +23,20 @@ def _coerce_level(level: Union[str, int]) -> int:
         return logging.INFO
 
 
+def _utc_timestamp(created: float) -> str:
+    """레코드 시각을 UTC ISO-8601 문자열로 변환 (datetime/tzinfo 객체 생성 없이)."""
+    ts = time.gmtime(created)
+    ms = int((created % 1) * 1000)
+    return (
+        f"{ts.tm_year:04d}-{ts.tm_mon:02d}-{ts.tm_mday:02d}"
+        f"T{ts.tm_hour:02d}:{ts.tm_min:02d}:{ts.tm_sec:02d}.{ms:03d}Z"
+    )
+
+
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:  # type: ignore[override]
         base = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "timestamp": _utc_timestamp(record.created),
             "level": record.levelname,
             "name": record.name,
             "message": record.getMessage(),
@@ -36,7 +46,7 @@ class JsonFormatter(logging.Formatter):
         }
         if record.exc_info:
             base["exception"] = self.formatException(record.exc_info)
-        return json.dumps(base, ensure_ascii=False)
+        return json_dumps_bytes(base).decode("utf-8")
 
 
 class SlackLogHandler(logging.Handler):
@@ -52,17 +62,24 @@ class SlackLogHandler(logging.Handler):
         self.webhook_url = webhook_url
         self.extra_flag_key = extra_flag_key
         self.rate_limit_per_minute = max(1, rate_limit_per_minute)
-        self._recent_sends: Deque[float] = deque()
+        # 토큰 버킷: 분당 rate_limit_per_minute 개 충전, 최대 버스트도 같은 값
+        self._tokens = float(self.rate_limit_per_minute)
+        self._rate = self.rate_limit_per_minute / 60.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
 
     def _allow_send(self) -> bool:
-        now = time.monotonic()
-        one_min_ago = now - 60.0
-        while self._recent_sends and self._recent_sends[0] < one_min_ago:
-            self._recent_sends.popleft()
-        if len(self._recent_sends) >= self.rate_limit_per_minute:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.rate_limit_per_minute),
+                self._tokens + (now - self._last) * self._rate,
+            )
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
             return False
-        self._recent_sends.append(now)
-        return True
 
     def emit(self, record: logging.LogRecord) -> None:  # type: ignore[override]
         try:
@@ -74,7 +91,8 @@ class SlackLogHandler(logging.Handler):
             if not self._allow_send():
                 return
             msg = self.format(record) if self.formatter else record.getMessage()
-            send_slack_message(msg, webhook_url=self.webhook_url)
+            # emit 호출 스레드가 Slack 왕복을 기다리지 않도록 워커로 넘긴다
+            enqueue_slack_message(msg, webhook_url=self.webhook_url)
         except Exception:
             # 절대 예외 전파 금지 (로깅에서 예외가 서비스 흐름을 막지 않도록)
             self.handleError(record)
@@ -116,10 +134,10 @@ def setup_logging(
     logger.addHandler(console)
 
     # 로그 디렉터리 자동 생성
-    log_file = log_file or f"./logs/${datetime.now().strftime('%Y-%m-%d %H:%M:%Sq')}.log"
+    log_file = log_file or f"./logs/fj_client-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.log"
     try:
         directory = os.path.dirname(log_file)
-        if directory:
+        if directory and not os.path.isdir(directory):
             os.makedirs(directory, exist_ok=True)
     except Exception:
         # 디렉터리 생성 실패 시에도 핸들러 생성 시도(권한 문제 등은 핸들러에서 예외 발생)
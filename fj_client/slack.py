@@ -1,7 +1,46 @@
+import atexit
 import os
-from typing import Any, Dict, Optional
+import queue
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from urllib3.util.retry import Retry
+except Exception:  # pragma: no cover
+    Retry = None  # type: ignore
+
+
+def _create_session() -> requests.Session:
+    s = requests.Session()
+    retry = None
+    if Retry is not None:
+        retry = Retry(
+            total=2,
+            # 읽기 타임아웃 시 재전송하면 같은 메시지가 중복 게시될 수 있음
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("POST",),
+            raise_on_status=False,
+        )
+    s.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry or 0))
+    return s
+
+
+# session 미지정 호출이 공유하는 keep-alive 세션 (hooks.slack.com TLS 핸드셰이크 재사용)
+_SESSION = _create_session()
+atexit.register(_SESSION.close)
+
+# 비동기 전송 큐와 지연 시작되는 워커 스레드
+_QUEUE: "queue.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.Queue(maxsize=1000)
+# 종료 시 큐를 비우는 데 허용할 최대 시간(초)
+_DRAIN_TIMEOUT = 5.0
+_worker: Optional[threading.Thread] = None
+_worker_lock = threading.Lock()
 
 
 def send_slack_message(
@@ -12,6 +51,7 @@ def send_slack_message(
     icon_emoji: Optional[str] = None,
     timeout_seconds: float = 5.0,
     retries: int = 0,
+    session: Optional[requests.Session] = None,
 ) -> Dict[str, Any]:
     """
     Slack Incoming Webhook 으로 간단한 텍스트 메시지를 전송합니다.
@@ -23,6 +63,7 @@ def send_slack_message(
         icon_emoji: 아이콘 이모지(옵션, 예: ":robot_face:")
         timeout_seconds: 요청 타임아웃(초)
         retries: 실패 시 재시도 횟수
+        session: 사용할 requests.Session. 없으면 모듈 공용 keep-alive 세션 사용
 
     Returns:
         {"ok": bool, "status": int, "error": Optional[str]}
@@ -37,17 +78,74 @@ def send_slack_message(
     if icon_emoji:
         payload["icon_emoji"] = icon_emoji
 
+    poster = session or _SESSION
     attempt = 0
     last_error: Optional[str] = None
     while attempt <= max(0, retries):
         try:
-            resp = requests.post(url, json=payload, timeout=timeout_seconds)
+            resp = poster.post(url, json=payload, timeout=timeout_seconds)
             if 200 <= resp.status_code < 300:
                 return {"ok": True, "status": resp.status_code, "error": None}
             last_error = f"status={resp.status_code} body={resp.text[:300]}"
+            # 잘못된 URL/페이로드 등 4xx 는 재시도해도 같은 결과
+            if 400 <= resp.status_code < 500 and resp.status_code != 429:
+                return {"ok": False, "status": resp.status_code, "error": last_error}
         except Exception as e:  # pragma: no cover - network/runtime error path
             last_error = str(e)
 
         attempt += 1
+        if attempt <= retries:
+            # 지수 백오프 (0.5s, 1s, 2s, ...)
+            time.sleep(0.5 * (2 ** (attempt - 1)))
 
     return {"ok": False, "status": 0, "error": last_error}
+
+
+def _worker_loop() -> None:
+    while True:
+        item = _QUEUE.get()
+        if item is None:
+            return
+        text, kwargs = item
+        try:
+            send_slack_message(text, **kwargs)
+        except Exception:  # pragma: no cover
+            # 로깅 핸들러에서 호출되므로 여기서 다시 로그를 남기지 않는다
+            pass
+
+
+def enqueue_slack_message(text: str, **kwargs: Any) -> bool:
+    """
+    send_slack_message 를 백그라운드 워커에서 실행하도록 큐에 넣습니다.
+    호출 스레드는 Slack 응답을 기다리지 않습니다.
+
+    Returns:
+        큐 적재 성공 여부 (큐가 가득 차면 메시지를 버리고 False)
+    """
+    global _worker
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = threading.Thread(target=_worker_loop, name="slack-sender", daemon=True)
+                _worker.start()
+    try:
+        _QUEUE.put_nowait((text, kwargs))
+        return True
+    except queue.Full:
+        return False
+
+
+def _drain_queue() -> None:
+    # 워커가 데몬 스레드라 종료 직전 알림(예: "Error in start")이 유실되지 않도록 sentinel 까지 처리 후 종료
+    worker = _worker
+    if worker is None or not worker.is_alive():
+        return
+    try:
+        _QUEUE.put(None, timeout=_DRAIN_TIMEOUT)
+    except queue.Full:
+        return
+    worker.join(timeout=_DRAIN_TIMEOUT)
+
+
+# atexit 은 역순 실행: _SESSION.close 보다 나중에 등록해 먼저 실행되도록 한다
+atexit.register(_drain_queue)
@@ -1,11 +1,64 @@
 import json
 import os
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+try:
+    # 선택 의존성: 설치되어 있으면 더 빠른 orjson 파서를 사용
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - optional dependency
+    _orjson = None  # type: ignore
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """orjson 이 있으면 orjson.loads, 없으면 표준 json.loads 로 파싱."""
+    if _orjson is not None:
+        return _orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    """orjson 이 있으면 orjson.dumps, 없으면 표준 json.dumps 결과를 UTF-8 bytes 로 반환."""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
 
 # JSON 추출용 정규식 (객체/배열 조각을 모두 포착)
+# 중첩 괄호를 처리하지 못하므로 내부에서는 _iter_json_spans 를 사용한다 (하위 호환용으로 유지)
 JSON_RE = re.compile(r"(\{.*?\}|\[.*?\])", re.DOTALL)
+# JSONP 래퍼 callback(...) 본문 추출용 (bytes 대상)
+_JSONP_RE = re.compile(rb"\w+\(\s*(.*?)\s*\);?\s*$", re.DOTALL)
+
+
+def _iter_json_spans(s: str) -> Iterator[str]:
+    """
+    문자열을 한 번만 훑으며 최상위 JSON 객체/배열 조각을 순서대로 반환.
+    괄호 깊이와 문자열 리터럴(이스케이프 포함)을 추적하므로 중첩 객체도 올바르게 잘라낸다.
+    """
+    depth = 0
+    start = 0
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(s):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == "{" or ch == "[":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == "}" or ch == "]":
+            if depth > 0:
+                depth -= 1
+                if depth == 0:
+                    yield s[start : i + 1]
+        elif ch == '"' and depth > 0:
+            in_string = True
 
 
 def extract_json_from_jsonp(text: str) -> Optional[str]:
@@ -17,19 +70,32 @@ def extract_json_from_jsonp(text: str) -> Optional[str]:
             return body
         except Exception:
             pass
-    m = JSON_RE.search(text)
+    return next(_iter_json_spans(text), None)
+
+
+def extract_json_from_jsonp_bytes(content: bytes) -> Optional[bytes]:
+    """
+    JSONP 응답 bytes 에서 JSON 본문을 bytes 로 추출. plain JSON이면 그대로 반환.
+    ASCII 래퍼를 str 로 디코드하지 않고 바로 json_loads 에 넘길 수 있다.
+    """
+    m = _JSONP_RE.search(content)
     if m:
         return m.group(1)
+    content = content.strip()
+    if content[:1] in (b"{", b"["):
+        return content
     return None
 
 
 def parse_signalr_frame(raw: str) -> List[Any]:
-    """SignalR 프레임 문자열에서 모든 JSON 객체/배열 조각을 찾아 파싱."""
-    items = JSON_RE.findall(raw)
+    """SignalR 프레임 문자열에서 모든 JSON 객체/배열 조각을 찾아 파싱. keep-alive `{}` 는 제외."""
+    items = list(_iter_json_spans(raw))
     parsed: List[Any] = []
     for it in items:
+        if it == "{}":
+            continue
         try:
-            parsed.append(json.loads(it))
+            parsed.append(json_loads(it))
         except Exception:
             parsed.append({"raw": it})
     return parsed
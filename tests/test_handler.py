@@ -0,0 +1,16 @@
+from fj_client.handler import _SLACK_MAX_CHARS, _SLACK_SEPARATOR, _pack_sections
+
+
+def test_pack_sections_joins_small_sections():
+    assert _pack_sections(["a", "b"]) == ["a" + _SLACK_SEPARATOR + "b"]
+
+
+def test_pack_sections_never_exceeds_limit():
+    messages = _pack_sections(["a" * 3000, "b" * 3000, "c" * 5000])
+    assert all(len(m) <= _SLACK_MAX_CHARS for m in messages)
+    assert "".join(m.replace(_SLACK_SEPARATOR, "") for m in messages) == "a" * 3000 + "b" * 3000 + "c" * 5000
+
+
+def test_pack_sections_splits_oversized_section_on_newline():
+    section = "x" * 3000 + "\n" + "y" * 3000
+    assert _pack_sections([section]) == ["x" * 3000, "y" * 3000]
@@ -0,0 +1,25 @@
+from fj_client.utils import extract_json_from_jsonp, parse_signalr_frame
+
+
+def test_keep_alive_frame_parses_to_empty_list():
+    assert parse_signalr_frame("{}") == []
+
+
+def test_parse_signalr_frame_keeps_nested_envelope_intact():
+    raw = '{"C":"d-1","M":[{"H":"NewsHub","M":"sendUpdates","A":["[{\\"Title\\":\\"a}b\\"}]"]}]}'
+    assert parse_signalr_frame(raw) == [
+        {
+            "C": "d-1",
+            "M": [{"H": "NewsHub", "M": "sendUpdates", "A": ['[{"Title":"a}b"}]']}],
+        }
+    ]
+
+
+def test_parse_signalr_frame_splits_multiple_fragments():
+    assert parse_signalr_frame('x{"a":{"b":1}}y[1,[2]]{}') == [{"a": {"b": 1}}, [1, [2]]]
+
+
+def test_extract_json_from_jsonp_returns_first_nested_span():
+    assert extract_json_from_jsonp('garbage {"a":{"b":1}} tail') == '{"a":{"b":1}}'
+    assert extract_json_from_jsonp('cb({"a":1})') == '{"a":1}'
+    assert extract_json_from_jsonp('cb({"a":1});') == '{"a":1}'